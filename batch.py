@@ -0,0 +1,205 @@
+"""Batch matching for offline runs over whole intake logs.
+
+Questions are grouped by category and scored chunk by chunk with rapidfuzz's
+vectorized ``process.cdist`` against the index's precomputed question lists.
+Chunks are spread over a process pool; results stream out in input order.
+
+Command line::
+
+    python -m batch intake.csv -o results.jsonl --workers 4
+
+Input is CSV (with a header) or JSONL with ``question`` and, optionally,
+``category`` fields; ``--category`` supplies the category for rows without
+one, and "All categories" searches the whole knowledge base. Output is
+JSONL, or CSV when the output file name ends in ``.csv``.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from rapidfuzz import process
+
+import knowledge_base
+from matcher import ALL_CATEGORIES, FAQIndex, NO_DATA_MESSAGE, NO_MATCH_MESSAGE, normalize
+
+DEFAULT_CHUNK_SIZE = 256
+
+@dataclass
+class BatchResult:
+    question: str
+    category: str
+    answer: str
+    matched_question: Optional[str]
+    score: float
+
+# ------------------------------
+# Scoring
+# ------------------------------
+def score_chunk(index: FAQIndex, rows: List[Tuple[str, str]]) -> List[BatchResult]:
+    """Score one chunk of ``(question, category)`` rows with one cdist call per category."""
+    results: List[Optional[BatchResult]] = [None] * len(rows)
+    by_category = {}
+    for pos, (question, category) in enumerate(rows):
+        by_category.setdefault(category, []).append(pos)
+
+    for category, positions in by_category.items():
+        if category == ALL_CATEGORIES:
+            choices, offset = index.questions, 0
+        else:
+            entry = index.categories.get(category)
+            choices, offset = (entry.questions, entry.offset) if entry else ([], 0)
+        if not choices:
+            for pos in positions:
+                results[pos] = BatchResult(rows[pos][0], category, NO_DATA_MESSAGE, None, 0.0)
+            continue
+
+        queries = [normalize(rows[pos][0]) for pos in positions]
+        scores = process.cdist(queries, choices, scorer=index.scorer, dtype=np.float32)
+        # argmax keeps the first of equal scores, like extractOne
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(positions)), best]
+        for pos, idx, score in zip(positions, best.tolist(), best_scores.tolist()):
+            faq = offset + idx
+            if score <= index.threshold:
+                results[pos] = BatchResult(rows[pos][0], category, NO_MATCH_MESSAGE, None,
+                                           round(score, 2))
+                continue
+            matched_category = index.category_of(faq) if category == ALL_CATEGORIES else category
+            results[pos] = BatchResult(rows[pos][0], matched_category, index.answers[faq],
+                                       index.source_questions[faq], round(score, 2))
+    return results
+
+# Set in the parent before forking, or loaded by each spawned worker
+_worker_index: Optional[FAQIndex] = None
+
+def _load_worker_index(kb_path: str):
+    global _worker_index
+    _worker_index = FAQIndex(knowledge_base.load(kb_path))
+
+def _score_in_worker(rows):
+    return score_chunk(_worker_index, rows)
+
+def _chunks(rows: Iterable[Tuple[str, str]], size: int) -> Iterator[List[Tuple[str, str]]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def answer_batch(rows: Iterable[Tuple[str, str]], index: Optional[FAQIndex] = None,
+                 workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 kb_path: str = knowledge_base.COMPILED_PATH) -> Iterator[BatchResult]:
+    """Yield a :class:`BatchResult` per ``(question, category)`` row, in input order.
+
+    ``index`` defaults to one built from the compiled knowledge base at
+    ``kb_path``. With ``workers > 1`` chunks run in a process pool; forked
+    workers inherit ``index``, spawned ones rebuild it from ``kb_path``.
+    """
+    if index is None:
+        index = FAQIndex(knowledge_base.load(kb_path))
+    if workers <= 1:
+        for chunk in _chunks(rows, chunk_size):
+            yield from score_chunk(index, chunk)
+        return
+
+    global _worker_index
+    if "fork" in multiprocessing.get_all_start_methods():
+        _worker_index = index
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(workers, initializer=_load_worker_index, initargs=(kb_path,))
+
+    # A bounded window of in-flight chunks keeps memory flat on large inputs
+    with pool:
+        pending = deque()
+        for chunk in _chunks(rows, chunk_size):
+            pending.append(pool.submit(_score_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+# ------------------------------
+# Command line
+# ------------------------------
+def read_rows(path: str, default_category: Optional[str]) -> Iterator[Tuple[str, str]]:
+    """Stream ``(question, category)`` rows from a CSV or JSONL file ("-" for stdin JSONL)."""
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        is_csv = path.lower().endswith(".csv")
+        records = csv.DictReader(f) if is_csv else (line for line in f if line.strip())
+        for line_no, record in enumerate(records, 1):
+            if not is_csv:
+                try:
+                    record = json.loads(record)
+                except ValueError:
+                    raise ValueError(f"{path}: record {line_no} is not valid JSON") from None
+                if not isinstance(record, dict):
+                    raise ValueError(f"{path}: record {line_no} is not a JSON object")
+            category = record.get("category") or default_category
+            if not record.get("question") or not category:
+                raise ValueError(f"{path}: record {line_no} needs a question and a category")
+            yield record["question"], category
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def write_results(results: Iterable[BatchResult], path: str) -> int:
+    count = 0
+    f = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+    try:
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=list(BatchResult.__dataclass_fields__))
+            writer.writeheader()
+            for result in results:
+                writer.writerow(asdict(result))
+                count += 1
+        else:
+            for result in results:
+                f.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return count
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Answer a file of legal questions in bulk.")
+    parser.add_argument("input", help="CSV or JSONL file with question[,category] fields, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (.csv or JSONL), default stdout")
+    parser.add_argument("--category", help="category for rows that do not name one")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--kb", default=knowledge_base.COMPILED_PATH, help="compiled knowledge base")
+    args = parser.parse_args(argv)
+
+    index = FAQIndex(knowledge_base.load(args.kb))
+    start = time.perf_counter()
+    try:
+        count = write_results(
+            answer_batch(read_rows(args.input, args.category), index,
+                         workers=args.workers, chunk_size=args.chunk_size, kb_path=args.kb),
+            args.output,
+        )
+    except ValueError as e:
+        # A bad input row stops the run; earlier chunks may already be written
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Answered {count} questions in {elapsed:.2f}s "
+          f"({count / elapsed if elapsed else 0:.0f} queries/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
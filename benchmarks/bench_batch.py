@@ -0,0 +1,46 @@
+"""Batch throughput (queries/s) versus calling find_best_answer in a loop.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_batch [--size 100000] [--queries 5000] [--workers 4]
+"""
+import argparse
+import os
+import time
+
+from batch import answer_batch
+from matcher import FAQIndex
+from benchmarks.synthetic import make_faqs, make_labeled_queries
+
+def qps(fn, count):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    faqs = make_faqs(args.size)
+    index = FAQIndex(faqs, cache_size=0)  # measure the matcher, not the answer cache
+    rows = [(q, c) for q, c, _ in make_labeled_queries(faqs, args.queries)]
+
+    runs = [
+        ("find_best_answer loop, exhaustive",
+         lambda: [index.find_best_answer(q, c, recall_k=0) for q, c in rows]),
+        ("find_best_answer loop, pruned",
+         lambda: [index.find_best_answer(q, c) for q, c in rows]),
+        ("answer_batch, 1 process",
+         lambda: list(answer_batch(rows, index, workers=1))),
+        (f"answer_batch, {args.workers} processes",
+         lambda: list(answer_batch(rows, index, workers=args.workers))),
+    ]
+    print(f"{args.size} FAQs, {len(rows)} queries")
+    for name, fn in runs:
+        print(f"  {name:<38} {qps(fn, len(rows)):>10.0f} queries/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Latency of one all-category search versus one category and six per-category calls.
+
+Before timing, the cross-category dedupe is checked against the real
+knowledge base: the non-compete question filed under two categories must be
+reported once, while "What is comparative negligence?" and "What is family
+law?" must still rank second for their near-namesakes. A failed check exits
+non-zero.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_cross_category [--sizes 120,10000,100000]
+"""
+import argparse
+import sys
+import time
+
+from rapidfuzz import process, fuzz
+
+import knowledge_base
+from matcher import FAQIndex, normalize
+from benchmarks.synthetic import make_faqs, make_labeled_queries
+
+# (query, questions expected in order at the top, questions that must not appear)
+DEDUPE_CASES = [
+    ("Are non-compete agreements enforceable?",
+     ["Are non-compete agreements enforceable?"], ["Are non-compete clauses enforceable?"]),
+    ("What is negligence?",
+     ["What is negligence?", "What is comparative negligence?"], []),
+    # Different FAQs in different categories that share most characters
+    ("What is family leave?", ["What is family leave?", "What is family law?"], []),
+]
+
+def check_dedupe() -> bool:
+    index = FAQIndex(knowledge_base.load(), cache_size=0)
+    ok = True
+    for query, expected, absent in DEDUPE_CASES:
+        found = [match.question for match in index.search_all(query)]
+        if found[:len(expected)] != expected or any(q in found for q in absent):
+            print(f"dedupe check failed for {query!r}: {found}")
+            ok = False
+    return ok
+
+def per_query_ms(fn, queries):
+    start = time.perf_counter()
+    for question, category in queries:
+        fn(question, category)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="120,10000,100000")
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    if not check_dedupe():
+        return 1
+    print(f"{'FAQs':>8} {'mode':<32} {'ms/q':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        faqs = make_faqs(size)
+        index = FAQIndex(faqs, cache_size=0)  # measure the matcher, not the answer cache
+        queries = [(q, c) for q, c, _ in make_labeled_queries(faqs, args.queries)]
+
+        def six_calls(question, category):
+            question_norm = normalize(question)
+            for entry in index.categories.values():
+                process.extractOne(question_norm, entry.questions, scorer=fuzz.ratio)
+
+        runs = [
+            ("one category, exhaustive", lambda q, c: index.find_best_answer(q, c, recall_k=0)),
+            ("one category, pruned", lambda q, c: index.find_best_answer(q, c)),
+            ("six extractOne calls", six_calls),
+            ("all categories, exhaustive", lambda q, c: index.search_all(q, recall_k=0)),
+            ("all categories, pruned", lambda q, c: index.search_all(q)),
+        ]
+        for name, fn in runs:
+            print(f"{size:>8} {name:<32} {per_query_ms(fn, queries):>8.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Per-query latency of the cached FAQIndex versus re-normalizing on every call.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_faq_index
+"""
+import time
+
+from rapidfuzz import process, fuzz
+
+from matcher import FAQIndex, normalize
+from benchmarks.synthetic import make_faqs, make_queries
+
+SIZES = [120, 10_000, 100_000]
+
+def legacy_find_best_answer(faqs, question, category):
+    """The matcher as it was before FAQIndex: normalizes the whole category per call."""
+    items = faqs.get(category, [])
+    if not items:
+        return "No data available for this category."
+    faq_questions = [normalize(item["question"]) for item in items]
+    best_match, score, idx = process.extractOne(
+        normalize(question), faq_questions, scorer=fuzz.ratio
+    )
+    return items[idx]["answer"] if score > 50 else None
+
+def per_query_ms(fn, queries):
+    start = time.perf_counter()
+    for question, category in queries:
+        fn(question, category)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+def main():
+    print(f"{'FAQs':>8} {'build ms':>10} {'legacy ms/q':>12} {'index ms/q':>11} {'speedup':>8}")
+    for size in SIZES:
+        faqs = make_faqs(size)
+        queries = make_queries(faqs, 200 if size <= 10_000 else 30)
+
+        start = time.perf_counter()
+        index = FAQIndex(faqs, cache_size=0)  # measure the matcher, not the answer cache
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy = per_query_ms(lambda q, c: legacy_find_best_answer(faqs, q, c), queries)
+        indexed = per_query_ms(index.find_best_answer, queries)
+        print(f"{size:>8} {build_ms:>10.1f} {legacy:>12.3f} {indexed:>11.3f} {legacy / indexed:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Session memory and per-rerun history cost: unbounded list versus QueryHistory.
+
+"list" is the previous session_state list, which every rerun rendered in
+full; QueryHistory keeps a bounded ring in memory and reads one page.
+"render" is the median time to read and format the entries a rerun would
+draw, with QueryHistory's ``len()`` and the oldest page.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_history [--counts 10,1000,10000]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+from history import LegalQuery, QueryHistory
+
+PAGE_SIZE = 10
+RENDER_REPEATS = 20
+
+@dataclass
+class OldLegalQuery:
+    question: str
+    category: str
+    timestamp: datetime.datetime
+    response: Optional[str] = None
+
+def render(queries) -> int:
+    return sum(len(f"**Q:** {q.question} | *{q.category}* ({q.timestamp:%Y-%m-%d %H:%M}) "
+                   f"**A:** {q.response}") for q in queries)
+
+def measure(make_store, add, visible, count):
+    tracemalloc.start()
+    store = make_store()
+    for i in range(count):
+        add(store, i)
+    memory_kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    # Spilled rows are written in batches as queries arrive, not per render
+    getattr(store, "flush", lambda: None)()
+    timings = []
+    for _ in range(RENDER_REPEATS):
+        start = time.perf_counter()
+        render(visible(store))
+        timings.append((time.perf_counter() - start) * 1e6)
+    return memory_kb, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", default="10,1000,10000")
+    args = parser.parse_args()
+
+    now = datetime.datetime.now()
+    question = "Can an employer fire an employee without notice in my state?"
+    answer = "In at-will employment states, yes, unless termination violates discrimination laws."
+
+    print(f"{'queries':>8} {'store':<13} {'memory KB':>10} {'render us':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(c) for c in args.counts.split(",")):
+            db_path = os.path.join(tmp, f"history_{count}.sqlite3")
+            rows = [
+                ("list", list,
+                 lambda s, i: s.append(OldLegalQuery(question, "Employment Law", now, answer)),
+                 lambda s: s),
+                ("QueryHistory", lambda: QueryHistory(db_path=db_path),
+                 lambda s, i: s.append(LegalQuery(question, "Employment Law", now, answer)),
+                 # The last page is the oldest one, so it is read back from SQLite
+                 lambda s: s.page((len(s) - 1) // PAGE_SIZE, PAGE_SIZE)),
+            ]
+            for name, make_store, add, visible in rows:
+                memory_kb, render_us = measure(make_store, add, visible, count)
+                print(f"{count:>8} {name:<13} {memory_kb:>10.1f} {render_us:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Overhead of the per-stage latency timers.
+
+Times an empty ``with instrumentation.stage(...)`` block while disabled and
+enabled, then the same labeled queries through ``find_best_answer`` both ways,
+and prints the stage percentiles the enabled run recorded.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_instrumentation [--size 10000] [--queries 2000]
+"""
+import argparse
+import time
+
+import instrumentation
+from matcher import FAQIndex
+from benchmarks.synthetic import make_faqs, make_labeled_queries
+
+def timer_ns(iterations: int) -> float:
+    stage = instrumentation.stage
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        with stage("bench"):
+            pass
+    return (time.perf_counter_ns() - start) / iterations
+
+def query_us(index, queries, rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for question, category, _ in queries:
+            index.find_best_answer(question, category)
+        best = min(best, (time.perf_counter() - start) * 1e6 / len(queries))
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    faqs = make_faqs(args.size)
+    # cache_size=0: every query runs the full pipeline
+    index = FAQIndex(faqs, cache_size=0)
+    queries = make_labeled_queries(faqs, args.queries)
+
+    results = {}
+    for enabled in (False, True):
+        instrumentation.set_enabled(enabled)
+        instrumentation.reset()
+        results[enabled] = (timer_ns(args.iterations), query_us(index, queries))
+    print(f"{'timers':<9} {'ns/stage':>9} {'us/query':>9}")
+    for enabled, (stage_ns, per_query) in results.items():
+        print(f"{'enabled' if enabled else 'disabled':<9} {stage_ns:>9.0f} {per_query:>9.1f}")
+    print(f"overhead per query: {results[True][1] - results[False][1]:+.2f} us")
+
+    print()
+    print(instrumentation.prometheus_text(), end="")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Startup time and memory of the compiled knowledge base versus an in-source literal.
+
+Each measurement runs in a fresh interpreter. ``RssAnon`` is private to the
+process; ``RssFile`` is page cache that every worker mapping the same compiled
+file shares.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_knowledge_base [--sizes 1000,100000,1000000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import knowledge_base
+from benchmarks.synthetic import make_faqs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child; prints a JSON result line
+CHILD = r"""
+import json, sys, time
+
+def rss_kb():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+mode, target = sys.argv[1], sys.argv[2]
+before = rss_kb()
+start = time.perf_counter()
+if mode == "literal":
+    sys.path.insert(0, target)
+    from faqs_literal import LEGAL_FAQS as faqs
+else:
+    import knowledge_base
+    faqs = knowledge_base.KnowledgeBase(target)
+load_ms = (time.perf_counter() - start) * 1000
+if mode.endswith("+index") or mode == "literal":
+    from matcher import FAQIndex
+    index = FAQIndex(faqs)
+total_ms = (time.perf_counter() - start) * 1000
+after = rss_kb()
+print(json.dumps({
+    "load_ms": load_ms,
+    "total_ms": total_ms,
+    "anon_mb": (after["RssAnon"] - before["RssAnon"]) / 1024,
+    "file_mb": (after["RssFile"] - before["RssFile"]) / 1024,
+}))
+"""
+
+def run_child(mode: str, target: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, target],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    args = parser.parse_args()
+
+    print(f"{'FAQs':>8} {'mode':<10} {'load ms':>9} {'+index ms':>10} {'anon MB':>8} {'file MB':>8} {'kb MB':>7}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        faqs = make_faqs(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            compiled = os.path.join(tmp, "faqs.kb")
+            knowledge_base.compile_faqs(faqs, compiled)
+            with open(os.path.join(tmp, "faqs_literal.py"), "w", encoding="utf-8") as f:
+                f.write(f"LEGAL_FAQS = {faqs!r}\n")
+            kb_mb = os.path.getsize(compiled) / 2**20
+
+            rows = [
+                ("literal", run_child("literal", tmp)),
+                ("mmap", run_child("mmap", compiled)),
+                ("mmap+index", run_child("mmap+index", compiled)),
+            ]
+            for mode, r in rows:
+                print(f"{size:>8} {mode:<10} {r['load_ms']:>9.1f} {r['total_ms']:>10.1f} "
+                      f"{r['anon_mb']:>8.1f} {r['file_mb']:>8.1f} {kb_mb:>7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Matcher regression suite: accuracy and latency per scorer, threshold and size.
+
+Every size gets a synthetic knowledge base plus labeled exact, typo'd,
+reordered, paraphrased and out-of-domain queries (``make_eval_queries``).
+Each variant is a ``FAQIndex`` with one scorer (fuzz.ratio, token_set_ratio
+or WRatio) and one threshold. Every query goes through
+``FAQIndex.find_best_answer``, the code the app ships, with the answer cache
+disabled. "indexed" is the default path with inverted-index pruning, and
+"exhaustive" passes ``recall_k=0``. ``--hybrid`` adds semantic + fuzz.ratio
+ranking.
+
+"top1" is the share of in-domain queries answered with the labeled FAQ.
+"false" is the share of all queries answered with a wrong FAQ, or answered at
+all when out of domain.
+
+Results go to JSON so runs can be compared between commits::
+
+    python -m benchmarks.bench_matcher --output before.json
+    git checkout <other commit>
+    python -m benchmarks.bench_matcher --output after.json --compare before.json
+
+Large corpora take a while; pass them explicitly::
+
+    python -m benchmarks.bench_matcher --sizes 120,10000,100000,1000000 --per-kind 50
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import rapidfuzz
+from rapidfuzz import fuzz
+
+from matcher import DEFAULT_RECALL_K, MATCH_THRESHOLD, NO_MATCH_MESSAGE, FAQIndex
+from semantic import SemanticIndex
+from benchmarks.synthetic import QUERY_KINDS, make_eval_queries, make_faqs
+
+SCORERS = {"ratio": fuzz.ratio, "token_set_ratio": fuzz.token_set_ratio, "WRatio": fuzz.WRatio}
+
+def run_queries(index: FAQIndex, queries, recall_k: Optional[int]):
+    """The answer to every query and its latency in microseconds."""
+    answers, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        answers.append(index.find_best_answer(q.query, q.category, recall_k=recall_k))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return answers, latencies
+
+def evaluate(queries, answers) -> Dict[str, float]:
+    in_domain = [i for i, q in enumerate(queries) if q.expected is not None]
+    result = {
+        "top1": sum(1 for i in in_domain if answers[i] == queries[i].expected) / len(in_domain),
+        "false": sum(1 for q, answer in zip(queries, answers)
+                     if answer != NO_MATCH_MESSAGE and answer != q.expected) / len(queries),
+    }
+    for kind in QUERY_KINDS:
+        rows = [(q, answer) for q, answer in zip(queries, answers) if q.kind == kind]
+        if rows:
+            # Out of domain, "correct" means nothing was answered
+            result[f"acc_{kind}"] = sum(
+                1 for q, answer in rows if answer == (q.expected or NO_MATCH_MESSAGE)
+            ) / len(rows)
+    return result
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    key = lambda r: (r["size"], r["variant"], r["threshold"])
+    before = {key(r): r for r in baseline["results"]}
+    print(f"\nchange against {baseline_path} ({baseline['meta'].get('commit')})")
+    print(f"{'FAQs':>8} {'variant':<28} {'thr':>4} {'top1':>7} {'false':>7} {'p50 us':>8} {'p99 us':>8}")
+    for r in results:
+        old = before.get(key(r))
+        if old is not None:
+            print(f"{r['size']:>8} {r['variant']:<28} {r['threshold']:>4.0f} "
+                  f"{r['top1'] - old['top1']:>+7.1%} {r['false'] - old['false']:>+7.1%} "
+                  f"{r['p50_us'] - old['p50_us']:>+8.1f} {r['p99_us'] - old['p99_us']:>+8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="120,10000")
+    parser.add_argument("--per-kind", type=int, default=200, help="queries of each kind")
+    parser.add_argument("--scorers", default=",".join(SCORERS))
+    parser.add_argument("--thresholds", default="50,60,70")
+    parser.add_argument("--recall-k", type=int, default=DEFAULT_RECALL_K)
+    parser.add_argument("--hybrid", action="store_true", help="also rank with semantic + fuzz.ratio")
+    parser.add_argument("--output", default="bench_matcher.json")
+    parser.add_argument("--compare", help="earlier --output file to diff against")
+    args = parser.parse_args()
+
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+    results = []
+    print(f"{'FAQs':>8} {'variant':<28} {'thr':>4} {'top1':>7} {'false':>7} {'p50 us':>8} "
+          f"{'p95 us':>8} {'p99 us':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        faqs = make_faqs(size)
+        queries = make_eval_queries(faqs, args.per_kind)
+        vectors = None
+        if args.hybrid:
+            questions = [item["question"] for items in faqs.values() for item in items]
+            answers = [item["answer"] for items in faqs.values() for item in items]
+            vectors = SemanticIndex.build(questions, answers)
+        # recall_k=None is the app's default (pruned, normally cached) path
+        variants = [(f"{name}/{mode}", SCORERS[name], recall_k, None)
+                    for name in args.scorers.split(",")
+                    for mode, recall_k in (("exhaustive", 0), ("indexed", None))]
+        if vectors is not None:
+            variants.append(("hybrid/indexed", fuzz.ratio, None, vectors))
+
+        # Built once per size; the variants only differ in plain attributes.
+        # cache_size=0: every query is scored
+        index = FAQIndex(faqs, recall_k=args.recall_k, cache_size=0)
+        for variant, scorer, recall_k, semantic in variants:
+            index.scorer, index.semantic = scorer, semantic
+            for threshold in thresholds:
+                index.threshold = threshold
+                answers, latencies = run_queries(index, queries, recall_k)
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                row = {"size": size, "variant": variant, "threshold": threshold,
+                       **evaluate(queries, answers),
+                       "p50_us": float(p50), "p95_us": float(p95), "p99_us": float(p99)}
+                results.append(row)
+                marker = " *" if variant == "ratio/indexed" and threshold == MATCH_THRESHOLD else ""
+                print(f"{size:>8} {variant:<28} {threshold:>4.0f} {row['top1']:>7.1%} "
+                      f"{row['false']:>7.1%} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}{marker}")
+
+    meta = {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "rapidfuzz": rapidfuzz.__version__,
+        "per_kind": args.per_kind,
+        "recall_k": args.recall_k,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=1)
+    print(f"\n* current app settings; results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Accuracy versus latency of inverted-index pruning against the exhaustive scan.
+
+For each ``recall_k`` the pruned matcher is compared with the exhaustive one
+(``recall_k=0``) on labeled exact, typo'd and truncated queries: "agree" is
+the share of queries where both return the same answer, "acc" the share
+answered with the labeled FAQ.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_pruning [--sizes 10000,100000] [--recall 64,256,1024]
+"""
+import argparse
+import time
+
+from matcher import FAQIndex
+from benchmarks.synthetic import make_faqs, make_labeled_queries
+
+def run(index, queries, recall_k):
+    answers = []
+    start = time.perf_counter()
+    for question, category, _ in queries:
+        answers.append(index.find_best_answer(question, category, recall_k=recall_k))
+    ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return answers, ms
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--recall", default="32,64,256,1024")
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'FAQs':>8} {'recall_k':>9} {'ms/q':>8} {'agree':>7} {'acc':>7}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        faqs = make_faqs(size)
+        # cache_size=0: measure the matcher, not the answer cache
+        index = FAQIndex(faqs, recall_k=max(int(k) for k in args.recall.split(",")), cache_size=0)
+        queries = make_labeled_queries(faqs, args.queries)
+        expected = [answer for _, _, answer in queries]
+
+        exhaustive, exhaustive_ms = run(index, queries, 0)
+        accuracy = sum(a == e for a, e in zip(exhaustive, expected)) / len(queries)
+        print(f"{size:>8} {'full':>9} {exhaustive_ms:>8.3f} {1:>7.1%} {accuracy:>7.1%}")
+        for recall_k in (int(k) for k in args.recall.split(",")):
+            pruned, ms = run(index, queries, recall_k)
+            agree = sum(a == b for a, b in zip(pruned, exhaustive)) / len(queries)
+            accuracy = sum(a == e for a, e in zip(pruned, expected)) / len(queries)
+            print(f"{size:>8} {recall_k:>9} {ms:>8.3f} {agree:>7.1%} {accuracy:>7.1%}")
+
+if __name__ == "__main__":
+    main()
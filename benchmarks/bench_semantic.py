@@ -0,0 +1,77 @@
+"""Accuracy and latency of fuzzy-only versus hybrid (semantic + fuzzy) ranking.
+
+Uses two labeled query sets against the real knowledge base:
+``benchmarks/paraphrases.jsonl`` is the set the lexicon in ``semantic.py`` was
+tuned on (plus typo'd questions fuzzy matching must keep answering), and
+``benchmarks/paraphrases_holdout.jsonl`` was written separately and never used
+for tuning, so its numbers are the ones to trust. "acc" counts queries answered with the expected FAQ (or
+correctly refused when none is expected); "false" counts queries answered
+with the wrong FAQ, or answered at all when none is expected.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_semantic [--weights 0.3,0.5,0.7]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import knowledge_base
+from matcher import FAQIndex, NO_MATCH_MESSAGE
+from semantic import SemanticIndex
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+QUERY_SETS = {
+    "tuning": os.path.join(HERE, "paraphrases.jsonl"),
+    "held-out": os.path.join(HERE, "paraphrases_holdout.jsonl"),
+}
+
+def evaluate(index, cases, answer_of):
+    correct = false = 0
+    latencies = []
+    for case in cases:
+        start = time.perf_counter()
+        answer = index.find_best_answer(case["query"], case["category"])
+        latencies.append((time.perf_counter() - start) * 1e6)
+        expected = answer_of.get(case["expected"], NO_MATCH_MESSAGE)
+        if answer == expected:
+            correct += 1
+        elif answer != NO_MATCH_MESSAGE:
+            false += 1
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return correct / len(cases), false / len(cases), p50, p99
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weights", default="0.3,0.5,0.7")
+    args = parser.parse_args()
+
+    query_sets = {}
+    for name, path in QUERY_SETS.items():
+        with open(path, encoding="utf-8") as f:
+            query_sets[name] = [json.loads(line) for line in f if line.strip()]
+    kb = knowledge_base.load()
+    answer_of = {item["question"]: item["answer"] for items in kb.values() for item in items}
+
+    start = time.perf_counter()
+    vectors = SemanticIndex.build(kb.all_questions, kb.answers)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{kb.faq_count} FAQs, vectors built in {build_ms:.1f} ms")
+    # cache_size=0: every query goes through the matcher
+    runs = [("fuzzy only", FAQIndex(kb, cache_size=0))]
+    for weight in (float(w) for w in args.weights.split(",")):
+        runs.append((f"hybrid w={weight}",
+                     FAQIndex(kb, cache_size=0, semantic=vectors, semantic_weight=weight)))
+    for set_name, cases in query_sets.items():
+        print(f"\n{set_name}: {len(cases)} labeled queries")
+        print(f"{'mode':<20} {'acc':>7} {'false':>7} {'p50 us':>8} {'p99 us':>8}")
+        for name, index in runs:
+            accuracy, false, p50, p99 = evaluate(index, cases, answer_of)
+            print(f"{name:<20} {accuracy:>7.1%} {false:>7.1%} {p50:>8.1f} {p99:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Local load test for the HTTP answer service.
+
+Opens ``concurrency`` keep-alive connections that each send /answer requests
+back to back for ``--duration`` seconds, and reports requests per second and
+latency percentiles at every concurrency level.
+
+The request bodies repeat (360 of them), so with the answer cache on, a warm
+server mostly answers from the cache. ``--spawn`` therefore runs the sweep
+once per ``--cache-sizes`` entry (by default the app's 1024 and 0). The
+``cache`` column is the spawned server's ANSWER_CACHE_SIZE, and the 0 rows
+measure the scoring itself.
+
+Run from the repository root; ``--spawn`` starts the server itself::
+
+    python -m benchmarks.loadtest --spawn --processes 2 [--levels 1,4,16,64]
+    python -m benchmarks.loadtest --port 8000        # against a running server
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import knowledge_base
+
+async def _client(host, port, bodies, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            body = random.choice(bodies)
+            start = time.perf_counter()
+            writer.write(
+                f"POST /answer HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length"))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0])
+    finally:
+        writer.close()
+
+async def run_level(host, port, bodies, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, bodies, deadline, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return len(latencies) / elapsed, p50, p95, p99, len(errors)
+
+def _wait_for_server(host, port, timeout=30.0):
+    import urllib.request
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://{host}:{port}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on {host}:{port} did not become healthy")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--levels", default="1,4,16,64")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per level")
+    parser.add_argument("--spawn", action="store_true", help="start the server for the run")
+    parser.add_argument("--processes", type=int, default=1, help="server processes with --spawn")
+    parser.add_argument("--cache-sizes", default="1024,0",
+                        help="ANSWER_CACHE_SIZE of each spawned server run")
+    args = parser.parse_args()
+
+    kb = knowledge_base.load()
+    # Real questions mixed with lightly edited ones, across all categories
+    bodies = [json.dumps({"question": item["question"] + suffix, "category": category}).encode()
+              for category, items in kb.items() for item in items for suffix in ("", " please", "??")]
+
+    print(f"{'cache':>6} {'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'errors':>7}")
+    for cache_size in (args.cache_sizes.split(",") if args.spawn else ["?"]):
+        server = None
+        if args.spawn:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "server", "--host", args.host, "--port", str(args.port),
+                 "--processes", str(args.processes)],
+                env={**os.environ, "ANSWER_CACHE_SIZE": cache_size})
+        try:
+            _wait_for_server(args.host, args.port)
+            for concurrency in (int(c) for c in args.levels.split(",")):
+                rps, p50, p95, p99, errors = asyncio.run(
+                    run_level(args.host, args.port, bodies, concurrency, args.duration))
+                print(f"{cache_size:>6} {concurrency:>11} {rps:>9.0f} {p50:>8.2f} {p95:>8.2f} "
+                      f"{p99:>8.2f} {errors:>7}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Synthetic LEGAL_FAQS-shaped knowledge bases for benchmarking."""
+import random
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+CATEGORY_TOPICS = {
+    "Contract Law": ["contract", "agreement", "clause", "breach", "signature", "novation",
+                     "offer", "acceptance", "consideration", "addendum", "warranty", "indemnity",
+                     "termination", "renewal", "arbitration", "deposit"],
+    "Employment Law": ["employer", "employee", "salary", "overtime", "termination", "contractor",
+                       "severance", "pension", "shift", "promotion", "harassment", "union",
+                       "payslip", "probation", "resignation", "bonus"],
+    "Property Law": ["landlord", "tenant", "deed", "mortgage", "easement", "lien",
+                     "lease", "boundary", "title", "zoning", "eviction", "rent",
+                     "survey", "fence", "inheritance", "foreclosure"],
+    "Family Law": ["divorce", "custody", "alimony", "adoption", "guardianship", "visitation",
+                   "marriage", "separation", "paternity", "prenup", "surrogacy", "annulment",
+                   "stepchild", "maintenance", "relocation", "mediation"],
+    "Consumer Rights": ["refund", "warranty", "product", "purchase", "seller", "subscription",
+                        "invoice", "recall", "delivery", "chargeback", "coupon", "repair",
+                        "retailer", "airline", "insurer", "lender"],
+    "Civil Law": ["negligence", "defamation", "injury", "damages", "lawsuit", "judgment",
+                  "nuisance", "trespass", "settlement", "appeal", "injunction", "witness",
+                  "liability", "libel", "claim", "mediator"],
+}
+
+QUALIFIERS = [
+    "written", "verbal", "online", "temporary", "permanent", "seasonal", "foreign", "local",
+    "minor", "elderly", "disabled", "pregnant", "retired", "unpaid", "late", "early",
+    "partial", "joint", "sole", "shared", "signed", "unsigned", "expired", "pending",
+    "urgent", "informal", "commercial", "residential", "rural", "digital", "verbalized", "sealed",
+    "emergency", "interim", "annual", "monthly", "weekly", "oral", "implied", "express",
+]
+
+TEMPLATES = [
+    "What is a {q} {a} {b}?",
+    "Can a {q} {a} refuse a {b}?",
+    "How do I challenge a {q} {a} {b} in {place}?",
+    "Is a {a} required for a {q} {b} in {place}?",
+    "Who pays for {q} {a} {b} costs?",
+    "What happens if the {a} ignores the {q} {b}?",
+    "Can I cancel a {q} {a} after the {b}?",
+    "When does a {q} {a} {b} expire in {place}?",
+    "Do I need a lawyer for a {q} {b} with my {a}?",
+    "How long does a {a} have to respond to a {q} {b}?",
+    "Can my {a} change the {b} without a {q} notice?",
+    "What are my rights if a {q} {a} breaks the {b}?",
+]
+
+PLACES = [
+    "California", "Texas", "Ontario", "Bavaria", "Victoria", "Scotland", "New York", "Quebec",
+    "Kerala", "Lagos", "Dublin", "Auckland", "Florida", "Oregon", "Manitoba", "Wales",
+    "Queensland", "Gauteng", "Punjab", "Catalonia", "Lombardy", "Flanders", "Ohio", "Nevada",
+]
+
+# Lexical paraphrases: phrases first, then single words
+PARAPHRASES = {
+    "What is a": "Can you explain a",
+    "Can I": "Am I allowed to",
+    "How do I": "What steps let me",
+    "Do I need": "Should I hire",
+    "How long does": "How much time does",
+    "What happens if": "What are the consequences when",
+    "What are my rights": "What protections do I have",
+    "Who pays for": "Who is responsible for",
+    "refuse": "decline",
+    "challenge": "dispute",
+    "required": "mandatory",
+    "ignores": "disregards",
+    "cancel": "terminate",
+    "expire": "lapse",
+    "lawyer": "attorney",
+    "respond": "reply",
+    "change": "alter",
+    "breaks": "violates",
+    "notice": "warning",
+    "costs": "expenses",
+    "employer": "boss",
+    "employee": "worker",
+    "salary": "wages",
+    "landlord": "property owner",
+    "tenant": "renter",
+    "divorce": "marriage dissolution",
+    "custody": "parental responsibility",
+    "refund": "money back",
+    "purchase": "order",
+    "seller": "vendor",
+    "lawsuit": "court case",
+    "injury": "harm",
+    "contract": "agreement",
+    "agreement": "deal",
+}
+
+OUT_OF_DOMAIN_TOPICS = [
+    "pizza", "bicycle", "guitar", "tomato", "telescope", "sourdough", "kayak", "printer",
+    "orchid", "marathon", "espresso", "volcano", "chess", "aquarium", "tennis", "lasagna",
+]
+
+OUT_OF_DOMAIN_TEMPLATES = [
+    "What is the best {x} recipe in {place}?",
+    "How do I repair a squeaky {x}?",
+    "When is the next {x} festival in {place}?",
+    "Which {x} should I buy for a beginner?",
+    "How often should I clean my {x}?",
+    "Why does my {x} smell strange?",
+]
+
+_PARAPHRASE_RE = re.compile(r"\b(" + "|".join(re.escape(k) for k in PARAPHRASES) + r")\b")
+
+QUERY_KINDS = ("exact", "typo", "reordered", "paraphrase", "out_of_domain")
+
+def make_faqs(size: int, seed: int = 0) -> Dict[str, List[dict]]:
+    """Return ``size`` distinct FAQs spread evenly over the real category names."""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_TOPICS)
+    faqs: Dict[str, List[dict]] = {category: [] for category in categories}
+    seen = set()
+    for i in range(size):
+        category = categories[i % len(categories)]
+        topics = CATEGORY_TOPICS[category]
+        question = None
+        while question is None or question in seen:
+            a, b = rng.sample(topics, 2)
+            question = rng.choice(TEMPLATES).format(
+                q=rng.choice(QUALIFIERS), a=a, b=b, place=rng.choice(PLACES)
+            )
+        seen.add(question)
+        faqs[category].append({
+            "question": question,
+            "answer": f"Synthetic answer {i} for {category}.",
+        })
+    return faqs
+
+def make_queries(faqs: Dict[str, List[dict]], count: int, seed: int = 1) -> List[tuple]:
+    """Sample ``(question, category)`` pairs drawn from the knowledge base."""
+    rng = random.Random(seed)
+    pairs = [(item["question"], category) for category, items in faqs.items() for item in items]
+    return [rng.choice(pairs) for _ in range(count)]
+
+def add_typos(text: str, rng: random.Random, count: int = 2) -> str:
+    """Drop, duplicate or swap ``count`` random characters."""
+    chars = list(text)
+    for _ in range(count):
+        i = rng.randrange(len(chars) - 1)
+        op = rng.randrange(3)
+        if op == 0:
+            del chars[i]
+        elif op == 1:
+            chars.insert(i, chars[i])
+        else:
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+def drop_word(text: str, rng: random.Random) -> str:
+    words = text.split()
+    del words[rng.randrange(len(words))]
+    return " ".join(words)
+
+def make_labeled_queries(faqs: Dict[str, List[dict]], count: int, seed: int = 2) -> List[tuple]:
+    """``(query, category, expected_answer)`` triples: exact, typo'd and truncated questions."""
+    rng = random.Random(seed)
+    variants = [lambda q: q, lambda q: add_typos(q, rng), lambda q: drop_word(q, rng)]
+    labeled = []
+    for question, category in make_queries(faqs, count, seed):
+        answer = next(item["answer"] for item in faqs[category] if item["question"] == question)
+        labeled.append((rng.choice(variants)(question), category, answer))
+    return labeled
+
+def reorder_words(text: str, rng: random.Random) -> str:
+    """Swap the two halves of the question around a random cut."""
+    words = text.split()
+    cut = rng.randrange(1, len(words))
+    return " ".join(words[cut:] + words[:cut])
+
+def paraphrase(text: str) -> str:
+    """Apply every matching entry of PARAPHRASES (whole words only, one pass)."""
+    return _PARAPHRASE_RE.sub(lambda m: PARAPHRASES[m.group(1)], text)
+
+def out_of_domain(rng: random.Random) -> str:
+    return rng.choice(OUT_OF_DOMAIN_TEMPLATES).format(
+        x=rng.choice(OUT_OF_DOMAIN_TOPICS), place=rng.choice(PLACES))
+
+@dataclass(frozen=True)
+class EvalQuery:
+    kind: str  # one of QUERY_KINDS
+    query: str
+    category: str
+    expected: Optional[str]  # labeled answer, None when nothing should match
+
+def make_eval_queries(faqs: Dict[str, List[dict]], per_kind: int, seed: int = 3) -> List[EvalQuery]:
+    """``per_kind`` queries of every kind in QUERY_KINDS.
+
+    Sources are sampled by position, so this stays cheap for million-entry
+    corpora. Paraphrases are drawn from questions that PARAPHRASES changes.
+    """
+    rng = random.Random(seed)
+    categories = [category for category, items in faqs.items() if items]
+    variants = {
+        "exact": lambda q: q,
+        "typo": lambda q: add_typos(q, rng),
+        "reordered": lambda q: reorder_words(q, rng),
+        "paraphrase": paraphrase,
+    }
+    queries = []
+    for kind, variant in variants.items():
+        made = 0
+        while made < per_kind:
+            category = rng.choice(categories)
+            item = rng.choice(faqs[category])
+            query = variant(item["question"])
+            if kind == "paraphrase" and query == item["question"]:
+                continue
+            queries.append(EvalQuery(kind, query, category, item["answer"]))
+            made += 1
+    queries.extend(EvalQuery("out_of_domain", out_of_domain(rng), rng.choice(categories), None)
+                   for _ in range(per_kind))
+    return queries
@@ -0,0 +1,178 @@
+"""Bounded per-session query history with SQLite spill-over.
+
+The newest ``capacity`` queries of a session stay in an in-memory ring
+buffer. Older ones are written to a local SQLite file in batches, so session
+memory stays flat however many questions a user asks, and the UI reads back
+only the page it shows.
+
+Spilled rows are only readable by their own session, so the file is pruned on
+every flush: rows older than ``max_age`` are deleted, and beyond ``max_rows``
+(across all sessions) the oldest go first.
+
+Each row carries its position in the session (``seq``), so any page, the
+oldest included, is one range scan over the ``(session, seq)`` index rather
+than an ``OFFSET`` walk.
+"""
+import datetime
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DB_PATH = os.path.join(DATA_DIR, "query_history.sqlite3")
+
+DEFAULT_CAPACITY = 50
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_MAX_AGE = datetime.timedelta(days=30)
+DEFAULT_MAX_ROWS = 100_000
+
+# Bumped when the table changes. Older tables are dropped: their rows belong
+# to ended sessions, which nothing can read back.
+_SCHEMA_VERSION = 2
+_SCHEMA = f"""
+DROP TABLE IF EXISTS queries;
+CREATE TABLE queries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    response TEXT
+);
+CREATE UNIQUE INDEX queries_session ON queries (session, seq);
+CREATE INDEX queries_timestamp ON queries (timestamp);
+PRAGMA user_version = {_SCHEMA_VERSION};
+"""
+
+# ------------------------------
+# Data Model for Query History
+# ------------------------------
+@dataclass(slots=True)
+class LegalQuery:
+    question: str
+    category: str
+    timestamp: datetime.datetime
+    response: Optional[str] = None
+
+class QueryHistory:
+    """Newest-first history of one session."""
+
+    def __init__(self, session_id: Optional[str] = None, capacity: int = DEFAULT_CAPACITY,
+                 batch_size: int = DEFAULT_BATCH_SIZE, db_path: str = DB_PATH,
+                 max_age: Optional[datetime.timedelta] = DEFAULT_MAX_AGE,
+                 max_rows: Optional[int] = DEFAULT_MAX_ROWS):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_age = max_age  # None keeps rows regardless of age
+        self.max_rows = max_rows  # None keeps any number of rows
+        self._recent: "deque[LegalQuery]" = deque(maxlen=capacity)
+        self._pending: List[LegalQuery] = []  # evicted from the ring, not yet written
+        # This session's rows in SQLite are seq first_seq .. next_seq - 1;
+        # other sessions' flushes may prune from the bottom
+        self._first_seq = 0
+        self._next_seq = 0
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            if self._next_seq > self._first_seq:
+                with self._connect() as conn:
+                    self._refresh_first_seq(conn)
+            return self._next_seq - self._first_seq + len(self._pending) + len(self._recent)
+
+    def append(self, query: LegalQuery) -> None:
+        with self._lock:
+            if len(self._recent) == self._recent.maxlen:
+                self._pending.append(self._recent[0])
+            self._recent.append(query)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write every spilled query to SQLite."""
+        with self._lock:
+            self._flush()
+
+    def page(self, number: int, size: int) -> List[LegalQuery]:
+        """Queries ``number * size`` to ``(number + 1) * size - 1``, newest first."""
+        start, stop = number * size, (number + 1) * size
+        with self._lock:
+            recent = len(self._recent)
+            items = [self._recent[-1 - i] for i in range(start, min(stop, recent))]
+            if stop > recent:
+                # The rest are older than the ring buffer and live on disk
+                self._flush()
+                if self._next_seq:
+                    items.extend(self._read(self._next_seq - 1 - max(start - recent, 0),
+                                            self._next_seq - 1 - (stop - recent)))
+        return items
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        rows = [(self.session_id, self._next_seq + i, q.question, q.category,
+                 q.timestamp.isoformat(), q.response)
+                for i, q in enumerate(self._pending)]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO queries (session, seq, question, category, timestamp, response)"
+                " VALUES (?, ?, ?, ?, ?, ?)", rows,
+            )
+            self._prune(conn)
+        self._next_seq += len(rows)
+        self._pending.clear()
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Apply the retention rules to every session's rows."""
+        if self.max_age is not None:
+            # ISO timestamps sort in time order
+            cutoff = (datetime.datetime.now() - self.max_age).isoformat()
+            conn.execute("DELETE FROM queries WHERE timestamp < ?", (cutoff,))
+        if self.max_rows is not None:
+            conn.execute(
+                "DELETE FROM queries WHERE id <= (SELECT MAX(id) FROM queries) - ?",
+                (self.max_rows,),
+            )
+
+    def _read(self, high: int, low: int) -> List[LegalQuery]:
+        """Rows with ``low < seq <= high``, newest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT question, category, timestamp, response FROM queries"
+                " WHERE session = ? AND seq <= ? AND seq > ? ORDER BY seq DESC",
+                (self.session_id, high, low),
+            ).fetchall()
+            self._refresh_first_seq(conn)
+        return [LegalQuery(q, c, datetime.datetime.fromisoformat(ts), r) for q, c, ts, r in rows]
+
+    def _refresh_first_seq(self, conn: sqlite3.Connection) -> None:
+        """Other sessions' flushes may have pruned this session's oldest rows."""
+        (first,) = conn.execute(
+            "SELECT MIN(seq) FROM queries WHERE session = ?", (self.session_id,)
+        ).fetchone()
+        self._first_seq = self._next_seq if first is None else first
+
+    @contextmanager
+    def _connect(self):
+        """A short-lived connection that commits on success and is always closed."""
+        if not self._schema_ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                if not self._schema_ready:
+                    (version,) = conn.execute("PRAGMA user_version").fetchone()
+                    if version != _SCHEMA_VERSION:
+                        conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+                yield conn
+        finally:
+            conn.close()
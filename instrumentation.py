@@ -0,0 +1,180 @@
+"""Per-stage latency timers for the answer pipeline.
+
+Stages feed rolling histograms (the most recent ``WINDOW`` samples) from which
+p50/p95/p99 are computed on read, so recording stays O(1). Disabled timers are
+a shared no-op object; enable with ``MATCHER_INSTRUMENTATION=1`` or
+:func:`set_enabled`.
+
+Usage::
+
+    with instrumentation.stage("normalize"):
+        question_norm = normalize(question)
+
+An opt-in cProfile capture mode profiles the next few answers; see
+:func:`request_profile` and :func:`profiled`.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+WINDOW = 4096
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = "legal_advisor_stage_seconds"
+
+_enabled = os.environ.get("MATCHER_INSTRUMENTATION", "").lower() in ("1", "true", "yes")
+
+def enabled() -> bool:
+    return _enabled
+
+def set_enabled(value: bool) -> None:
+    global _enabled
+    _enabled = value
+
+# ------------------------------
+# Rolling histograms
+# ------------------------------
+class RollingHistogram:
+    """Latency samples in nanoseconds: lifetime count/sum plus a window for quantiles."""
+
+    def __init__(self, window: int = WINDOW):
+        self._samples: "deque[int]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ns = 0
+
+    def observe(self, elapsed_ns: int) -> None:
+        with self._lock:
+            self._samples.append(elapsed_ns)
+            self.count += 1
+            self.total_ns += elapsed_ns
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total_ns = self.count, self.total_ns
+        result = {"count": count, "sum_seconds": total_ns / 1e9}
+        for q in QUANTILES:
+            value = samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0
+            result[f"p{round(q * 100)}_us"] = value / 1e3
+        return result
+
+_histograms: Dict[str, RollingHistogram] = {}
+_histograms_lock = threading.Lock()
+
+def histogram(name: str) -> RollingHistogram:
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, RollingHistogram())
+    return hist
+
+def record(name: str, start_ns: int) -> None:
+    """Record the time since ``start_ns`` (from ``time.perf_counter_ns``) under ``name``."""
+    if _enabled:
+        histogram(name).observe(time.perf_counter_ns() - start_ns)
+
+class _Timer:
+    __slots__ = ("_hist", "_start")
+
+    def __init__(self, hist: RollingHistogram):
+        self._hist = hist
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter_ns() - self._start)
+        return False
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoopTimer()
+
+def stage(name: str):
+    """Context manager timing one pipeline stage (a no-op while disabled)."""
+    return _Timer(histogram(name)) if _enabled else _NOOP
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    return {name: hist.snapshot() for name, hist in sorted(_histograms.items())}
+
+def reset() -> None:
+    with _histograms_lock:
+        _histograms.clear()
+
+def prometheus_text() -> str:
+    """Every stage as a Prometheus summary in the text exposition format."""
+    lines = [f"# HELP {METRIC_NAME} Latency of answer pipeline stages.",
+             f"# TYPE {METRIC_NAME} summary"]
+    for name, snap in snapshot().items():
+        for q in QUANTILES:
+            seconds = snap[f"p{round(q * 100)}_us"] / 1e6
+            lines.append(f'{METRIC_NAME}{{stage="{name}",quantile="{q}"}} {seconds:.9f}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{name}"}} {snap["sum_seconds"]:.9f}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{name}"}} {snap["count"]}')
+    return "\n".join(lines) + "\n"
+
+# ------------------------------
+# cProfile capture
+# ------------------------------
+_profile_lock = threading.Lock()
+_profiles_requested = 0
+_profiles: "deque[str]" = deque(maxlen=5)
+
+def request_profile(count: int = 1) -> None:
+    """Profile the next ``count`` calls wrapped in :func:`profiled`."""
+    global _profiles_requested
+    with _profile_lock:
+        _profiles_requested = count
+
+def pending_profiles() -> int:
+    return _profiles_requested
+
+def _claim_profile() -> bool:
+    global _profiles_requested
+    if not _profiles_requested:
+        return False
+    with _profile_lock:
+        if _profiles_requested:
+            _profiles_requested -= 1
+            return True
+    return False
+
+class profiled:
+    """Runs the block under cProfile when a capture was requested, else does nothing."""
+
+    def __init__(self, label: str, limit: int = 25):
+        self.label = label
+        self.limit = limit
+        self._profile: Optional[cProfile.Profile] = None
+
+    def __enter__(self):
+        if _claim_profile():
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profile is not None:
+            self._profile.disable()
+            out = io.StringIO()
+            out.write(f"{self.label}\n")
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(self.limit)
+            _profiles.append(out.getvalue())
+        return False
+
+def captured_profiles() -> List[str]:
+    """Most recent captured profiles, newest first."""
+    return list(reversed(_profiles))
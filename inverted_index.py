@@ -0,0 +1,84 @@
+"""Token and character n-gram inverted index for candidate pruning.
+
+Scoring every question of a large category with rapidfuzz is linear in the
+category size. The inverted index instead ranks questions by the IDF-weighted
+features they share with the query and hands only the best ``k`` to rapidfuzz
+for rescoring.
+"""
+from typing import Dict, List, Set
+
+import numpy as np
+
+NGRAM = 3
+
+# Features in more than this share of the questions ("#what", " wh") carry
+# almost no signal but dominate the posting lists a query has to read
+MAX_DF_RATIO = 0.2
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+def features(text: str) -> Set[str]:
+    """Whole tokens plus the character trigrams of each token of a normalized string.
+
+    Tokens get a ``#`` prefix, which normalization strips from the text, so
+    a three-letter word never collides with a trigram.
+    """
+    grams: Set[str] = set()
+    for token in text.split():
+        grams.add("#" + token)
+        grams |= _trigrams(token)
+    return grams
+
+class InvertedIndex:
+    """Feature -> question postings, stored as one CSR array."""
+
+    def __init__(self, questions: List[str]):
+        self.size = len(questions)
+        self._vocab: Dict[str, int] = {}
+        feature_ids: List[int] = []
+        doc_ids: List[int] = []
+        for doc, question in enumerate(questions):
+            for feature in features(question):
+                feature_ids.append(self._vocab.setdefault(feature, len(self._vocab)))
+                doc_ids.append(doc)
+
+        feature_arr = np.array(feature_ids, dtype=np.int32)
+        order = np.argsort(feature_arr, kind="stable")
+        self._postings = np.array(doc_ids, dtype=np.int32)[order]
+        self._df = np.bincount(feature_arr, minlength=len(self._vocab))
+        self._starts = np.concatenate(([0], np.cumsum(self._df)))
+        self._idf = np.log1p(self.size / np.maximum(self._df, 1))
+        self._max_df = max(1, int(self.size * MAX_DF_RATIO))
+
+    def candidates(self, query: str, k: int) -> np.ndarray:
+        """Return up to ``k`` question ids sharing features with ``query``, in index order.
+
+        An empty result means the query shares no selective feature with any
+        question; callers should fall back to a full scan.
+        """
+        # Known tokens are matched whole; only unknown (often misspelled)
+        # tokens fall back to their trigrams, which keeps posting lists short
+        ids = []
+        for token in set(query.split()):
+            feature_id = self._vocab.get("#" + token)
+            if feature_id is not None:
+                ids.append(feature_id)
+            else:
+                ids.extend(self._vocab[g] for g in _trigrams(token) if g in self._vocab)
+        ids = np.array(ids, dtype=np.int64)
+        ids = ids[self._df[ids] <= self._max_df]
+        if not len(ids):
+            return np.empty(0, dtype=np.int32)
+
+        postings = np.concatenate([self._postings[self._starts[i]:self._starts[i + 1]] for i in ids])
+        weights = np.repeat(self._idf[ids], self._df[ids])
+        scores = np.bincount(postings, weights=weights, minlength=self.size)
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(scores[hits], -k)[-k:]]
+            # Ascending ids keep rapidfuzz's tie-breaking identical to a full scan
+            hits.sort()
+        return hits
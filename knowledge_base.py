@@ -0,0 +1,228 @@
+"""On-disk FAQ knowledge base.
+
+FAQs are authored as JSONL (one ``{"category", "question", "answer"}`` object
+per line) and compiled into a compact binary file that is memory-mapped, so
+every worker process shares one page-cache copy and an answer is only decoded
+when it is shown.
+
+Compiled layout (little-endian)::
+
+    header      magic b"LFAQ", version, category count, FAQ count
+    categories  name offset, name length, first FAQ, FAQ count
+    faqs        question offset, question length, answer offset, answer length
+    blob        UTF-8 text; offsets are relative to the start of the blob
+
+Compile after editing the source::
+
+    python -m knowledge_base compile [source.jsonl] [compiled.kb]
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SOURCE_PATH = os.path.join(DATA_DIR, "legal_faqs.jsonl")
+COMPILED_PATH = os.path.join(DATA_DIR, "legal_faqs.kb")
+
+MAGIC = b"LFAQ"
+VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+_CATEGORY = struct.Struct("<QIII")
+_FAQ = struct.Struct("<QIQI")
+
+# ------------------------------
+# Compiler
+# ------------------------------
+def read_jsonl(path: str) -> Dict[str, List[dict]]:
+    """Read a JSONL source file into the LEGAL_FAQS shape, keeping category order."""
+    faqs: Dict[str, List[dict]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                entry = {"question": row["question"], "answer": row["answer"]}
+                faqs.setdefault(row["category"], []).append(entry)
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{line_no}: invalid FAQ entry ({e})") from e
+    return faqs
+
+def compile_faqs(faqs: Dict[str, List[dict]], path: str) -> None:
+    """Write ``faqs`` to ``path`` in the compiled format.
+
+    The file is written next to its destination and renamed into place, so
+    processes that already mapped the old file keep a consistent view.
+    """
+    blob = bytearray()
+
+    def add(text: str):
+        data = text.encode("utf-8")
+        offset = len(blob)
+        blob.extend(data)
+        return offset, len(data)
+
+    category_table = bytearray()
+    faq_table = bytearray()
+    first = 0
+    for category, items in faqs.items():
+        category_table += _CATEGORY.pack(*add(category), first, len(items))
+        for item in items:
+            faq_table += _FAQ.pack(*add(item["question"]), *add(item["answer"]))
+        first += len(items)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(faqs), first))
+            f.write(category_table)
+            f.write(faq_table)
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def compile_jsonl(source: str = SOURCE_PATH, compiled: str = COMPILED_PATH) -> None:
+    compile_faqs(read_jsonl(source), compiled)
+
+# ------------------------------
+# Memory-mapped reader
+# ------------------------------
+class CategoryFAQs(Sequence):
+    """The FAQs of one category; entries are decoded on access."""
+
+    def __init__(self, kb: "KnowledgeBase", first: int, count: int):
+        self._kb = kb
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return {"question": self._kb.question(self._first + i),
+                "answer": self._kb.answer(self._first + i)}
+
+class FieldView(Sequence):
+    """One field of every FAQ in file order, decoded on access."""
+
+    def __init__(self, decode, count: int):
+        self._decode = decode
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._decode(i)
+
+class KnowledgeBase(Mapping):
+    """Read-only, memory-mapped view of a compiled knowledge base.
+
+    Behaves like ``LEGAL_FAQS``: a mapping from category name to a sequence
+    of ``{"question": ..., "answer": ...}`` entries.
+    """
+
+    def __init__(self, path: str = COMPILED_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, category_count, self.faq_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a compiled knowledge base (version {VERSION})")
+        self._faq_table = _HEADER.size + category_count * _CATEGORY.size
+        self._blob = self._faq_table + self.faq_count * _FAQ.size
+
+        self._categories: Dict[str, tuple] = {}
+        for name_offset, name_length, first, count in _CATEGORY.iter_unpack(
+            self._mm[_HEADER.size:self._faq_table]
+        ):
+            self._categories[self._text(name_offset, name_length)] = (first, count)
+        self.all_questions = FieldView(self.question, self.faq_count)
+        self.answers = FieldView(self.answer, self.faq_count)
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self._blob + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def question(self, i: int) -> str:
+        q_offset, q_length, _, _ = _FAQ.unpack_from(self._mm, self._faq_table + i * _FAQ.size)
+        return self._text(q_offset, q_length)
+
+    def answer(self, i: int) -> str:
+        _, _, a_offset, a_length = _FAQ.unpack_from(self._mm, self._faq_table + i * _FAQ.size)
+        return self._text(a_offset, a_length)
+
+    def questions(self, category: str) -> List[str]:
+        """Decode every question of ``category`` (answers are left untouched)."""
+        first, count = self._categories[category]
+        start = self._faq_table + first * _FAQ.size
+        rows = _FAQ.iter_unpack(self._mm[start:start + count * _FAQ.size])
+        return [self._text(q_offset, q_length) for q_offset, q_length, _, _ in rows]
+
+    def offset(self, category: str) -> int:
+        """Global position of the category's first FAQ."""
+        return self._categories[category][0]
+
+    def __getitem__(self, category: str) -> CategoryFAQs:
+        first, count = self._categories[category]
+        return CategoryFAQs(self, first, count)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._categories)
+
+    def __len__(self):
+        return len(self._categories)
+
+# ------------------------------
+# Loading and hot reload
+# ------------------------------
+_loaded: Dict[str, KnowledgeBase] = {}
+
+def load(path: str = COMPILED_PATH) -> KnowledgeBase:
+    """Return the knowledge base at ``path``, reopening it when its mtime changes.
+
+    The default compiled file is built from the JSONL source if it does not
+    exist yet.
+    """
+    if path == COMPILED_PATH and not os.path.exists(path):
+        compile_jsonl()
+    mtime_ns = os.stat(path).st_mtime_ns
+    kb = _loaded.get(path)
+    if kb is None or kb.mtime_ns != mtime_ns:
+        # The previous mapping stays alive for as long as an index refers to it
+        kb = _loaded[path] = KnowledgeBase(path)
+    return kb
+
+def main(argv: List[str]) -> int:
+    if not argv or argv[0] != "compile" or len(argv) > 3:
+        print("usage: python -m knowledge_base compile [source.jsonl] [compiled.kb]", file=sys.stderr)
+        return 2
+    source = argv[1] if len(argv) > 1 else SOURCE_PATH
+    compiled = argv[2] if len(argv) > 2 else COMPILED_PATH
+    compile_jsonl(source, compiled)
+    kb = KnowledgeBase(compiled)
+    print(f"Compiled {kb.faq_count} FAQs in {len(kb)} categories to {compiled}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,309 @@
+import os
+import re  # For normalization
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import process, fuzz
+
+from answer_cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, AnswerCache
+import instrumentation
+from inverted_index import InvertedIndex
+import knowledge_base
+import semantic
+from knowledge_base import KnowledgeBase
+from semantic import SemanticIndex
+
+NO_DATA_MESSAGE = "No data available for this category."
+NO_MATCH_MESSAGE = "Sorry, no close match found. Please try rephrasing your question."
+
+# Lower threshold to 50 to catch short exact matches
+MATCH_THRESHOLD = 50
+
+# Candidates kept by the inverted index for rapidfuzz to rescore; categories
+# no larger than this are always scanned in full
+DEFAULT_RECALL_K = 256
+
+# Pseudo-category that searches the whole knowledge base
+ALL_CATEGORIES = "All categories"
+
+# Matches from different categories are the same FAQ filed twice (only the
+# best is kept) when this share of the longer question's content words also
+# appear in the other. Word level, because character scores rank "family
+# leave"/"family law" above "non compete agreements"/"non compete clauses"
+DEDUPE_OVERLAP = 0.75
+
+# Share of the hybrid score taken by semantic similarity (scaled to 0-100);
+# the rest is the fuzzy score. On benchmarks/paraphrases_holdout.jsonl 0.3 is
+# the only weight tried (0.3/0.5/0.7) that answers more questions correctly
+# than fuzzy-only without also giving more wrong answers; 0.5 nearly doubled them
+DEFAULT_SEMANTIC_WEIGHT = 0.3
+
+# ------------------------------
+# Normalization
+# ------------------------------
+def normalize(text):
+    """Lowercase and remove punctuation for better matching."""
+    return re.sub(r'\W+', ' ', text).strip().lower()
+
+def same_question(a: str, b: str) -> bool:
+    """Whether normalized questions ``a`` and ``b`` ask the same thing (see DEDUPE_OVERLAP)."""
+    words_a = set(a.split()) - semantic.STOPWORDS
+    words_b = set(b.split()) - semantic.STOPWORDS
+    if not words_a or not words_b:
+        return a == b
+    return len(words_a & words_b) / max(len(words_a), len(words_b)) >= DEDUPE_OVERLAP
+
+# ------------------------------
+# Precompiled FAQ Index
+# ------------------------------
+@dataclass(frozen=True)
+class CategoryIndex:
+    questions: List[str]  # normalized FAQ questions
+    inverted: Optional[InvertedIndex]  # token/n-gram postings, None for small categories
+    offset: int  # position of the category's first answer in FAQIndex.answers
+
+@dataclass(frozen=True)
+class Match:
+    category: str
+    question: str
+    answer: str
+    score: float
+
+class FAQIndex:
+    """Knowledge base normalized once, so a query only pays for its own normalization."""
+
+    def __init__(self, faqs: Mapping[str, Sequence[dict]], recall_k: int = DEFAULT_RECALL_K,
+                 cache_size: int = DEFAULT_CACHE_SIZE, cache_ttl: Optional[float] = DEFAULT_CACHE_TTL,
+                 semantic: Optional[SemanticIndex] = None,
+                 semantic_weight: float = DEFAULT_SEMANTIC_WEIGHT,
+                 scorer: Callable = fuzz.ratio, threshold: float = MATCH_THRESHOLD):
+        self.recall_k = recall_k
+        # rapidfuzz scorer for fuzzy ranking; answers need a score above threshold
+        self.scorer = scorer
+        self.threshold = threshold
+        # Optional hybrid stage; rows must follow the knowledge base order
+        self.semantic = semantic
+        self.semantic_weight = semantic_weight
+        # Lives and dies with the index, so a reloaded knowledge base starts cold
+        self.cache = AnswerCache(cache_size, cache_ttl)
+        self.categories: Dict[str, CategoryIndex] = {}
+        if isinstance(faqs, KnowledgeBase):
+            # Source text stays in the memory map until it is returned
+            self.source_questions: Sequence[str] = faqs.all_questions
+            self.answers: Sequence[str] = faqs.answers
+            sources = [(category, faqs.questions(category), faqs.offset(category))
+                       for category in faqs]
+        else:
+            self.source_questions = []
+            self.answers = []
+            sources = []
+            for category, items in faqs.items():
+                sources.append((category, [item["question"] for item in items], len(self.answers)))
+                self.source_questions.extend(item["question"] for item in items)
+                self.answers.extend(item["answer"] for item in items)
+
+        for category, raw_questions, offset in sources:
+            questions = [normalize(q) for q in raw_questions]
+            self.categories[category] = CategoryIndex(
+                questions=questions,
+                inverted=InvertedIndex(questions) if recall_k and len(questions) > recall_k else None,
+                offset=offset,
+            )
+
+        # Global view for cross-category search; shares the strings above
+        self.questions: List[str] = [q for entry in self.categories.values() for q in entry.questions]
+        self.inverted = (InvertedIndex(self.questions)
+                         if recall_k and len(self.questions) > recall_k else None)
+        self._offsets = [entry.offset for entry in self.categories.values()]
+        self._names = list(self.categories)
+
+    def __len__(self):
+        return len(self.answers)
+
+    def category_of(self, idx: int) -> str:
+        """Category of the FAQ at global position ``idx``."""
+        return self._names[bisect_right(self._offsets, idx) - 1]
+
+    def find_best_answer(self, question: str, category: str,
+                         recall_k: Optional[int] = None) -> str:
+        """Answer ``question`` from ``category`` (or from every category with ALL_CATEGORIES).
+
+        ``recall_k`` overrides how many inverted-index candidates are rescored;
+        0 forces an exhaustive scan. Only default lookups are cached.
+        """
+        if category != ALL_CATEGORIES and not self.has_data(category):
+            return NO_DATA_MESSAGE
+        match = self.match(question, category, recall_k)
+        return match.answer if match is not None else NO_MATCH_MESSAGE
+
+    def match(self, question: str, category: str,
+              recall_k: Optional[int] = None) -> Optional[Match]:
+        """The best match scoring above the threshold, or None; see :meth:`find_best_answer`."""
+        with instrumentation.stage("normalize"):
+            question_norm = normalize(question)
+        if recall_k is not None:
+            return self._match(question_norm, category, recall_k)
+        return self.cache.get_or_compute(
+            (question_norm, category), lambda: self._match(question_norm, category, self.recall_k)
+        )
+
+    def has_data(self, category: str) -> bool:
+        entry = self.categories.get(category)
+        return entry is not None and bool(entry.questions)
+
+    def search_all(self, question: str, limit: int = 3,
+                   recall_k: Optional[int] = None) -> List[Match]:
+        """Top ``limit`` matches over every category in one scoring pass, best first.
+
+        Near-identical questions filed under several categories are reported once.
+        """
+        with instrumentation.stage("normalize"):
+            question_norm = normalize(question)
+        if recall_k is not None:
+            return self._search_all(question_norm, limit, recall_k)
+        return self.cache.get_or_compute(
+            (question_norm, ALL_CATEGORIES, limit),
+            lambda: self._search_all(question_norm, limit, self.recall_k),
+        )
+
+    def _match(self, question_norm: str, category: str, recall_k: int) -> Optional[Match]:
+        if category == ALL_CATEGORIES:
+            matches = self._search_all(question_norm, 1, recall_k)
+            return matches[0] if matches else None
+
+        if not self.has_data(category):
+            return None
+        entry = self.categories[category]
+
+        if self.semantic is not None:
+            with instrumentation.stage("hybrid"):
+                [(best_match, score, idx)] = self._hybrid_hits(
+                    question_norm, entry.inverted, entry.questions, entry.offset, recall_k, 1
+                )
+        else:
+            with instrumentation.stage("candidates"):
+                choices, ids = self._candidates(entry.inverted, entry.questions, question_norm, recall_k)
+            with instrumentation.stage("score"):
+                # fuzz.ratio by default, which suits short questions
+                best_match, score, pos = process.extractOne(question_norm, choices, scorer=self.scorer)
+            idx = pos if ids is None else int(ids[pos])
+
+        if score > self.threshold:
+            faq = entry.offset + idx
+            return Match(category, self.source_questions[faq], self.answers[faq], score)
+        else:
+            return None
+
+    def _search_all(self, question_norm: str, limit: int, recall_k: int) -> List[Match]:
+        if not self.questions:
+            return []
+        recall_k = max(recall_k, limit) if recall_k else 0
+
+        # Over-fetch so that dropped duplicates can be replaced
+        if self.semantic is not None:
+            with instrumentation.stage("hybrid"):
+                hits = self._hybrid_hits(question_norm, self.inverted, self.questions, 0,
+                                         recall_k, limit * 4)
+        else:
+            with instrumentation.stage("candidates"):
+                choices, ids = self._candidates(self.inverted, self.questions, question_norm, recall_k)
+            with instrumentation.stage("score"):
+                hits = [(choice, score, pos if ids is None else int(ids[pos]))
+                        for choice, score, pos in process.extract(
+                            question_norm, choices, scorer=self.scorer,
+                            limit=limit * 4, score_cutoff=self.threshold)]
+        matches: List[Match] = []
+        kept: List[Tuple[str, str]] = []
+        for choice, score, idx in hits:
+            if score <= self.threshold:
+                continue
+            category = self.category_of(idx)
+            if any(category != seen_category and same_question(choice, seen)
+                   for seen, seen_category in kept):
+                continue
+            kept.append((choice, category))
+            matches.append(Match(category, self.source_questions[idx], self.answers[idx], score))
+            if len(matches) == limit:
+                break
+        return matches
+
+    def _hybrid_hits(self, question_norm: str, inverted: Optional[InvertedIndex],
+                     questions: List[str], offset: int, recall_k: int, limit: int):
+        """Best ``limit`` ``(question, blended score, position)`` triples, best first.
+
+        Candidates are the fuzzy ones plus the ``recall_k`` most similar
+        vectors, so paraphrases without shared features are still considered.
+        A query with no known terms (a zero vector) is ranked on the fuzzy
+        score alone rather than having its score halved.
+        """
+        query = self.semantic.query(question_norm)
+        if not query.any():
+            return self._fuzzy_hits(question_norm, inverted, questions, recall_k, limit)
+        similarity = self.semantic.matrix[offset:offset + len(questions)] @ query
+        choices, ids = self._candidates(inverted, questions, question_norm, recall_k)
+        if ids is None:
+            ids = np.arange(len(questions))
+        else:
+            nearest = np.argpartition(similarity, -recall_k)[-recall_k:]
+            ids = np.union1d(ids, nearest)
+            choices = [questions[i] for i in ids]
+
+        fuzzy = process.cdist([question_norm], choices, scorer=self.scorer, dtype=np.float32)[0]
+        blended = ((1 - self.semantic_weight) * fuzzy
+                   + self.semantic_weight * 100 * np.clip(similarity[ids], 0, 1))
+        # Stable sort keeps the lowest position first among equal scores
+        best = np.argsort(-blended, kind="stable")[:limit]
+        return [(choices[i], float(blended[i]), int(ids[i])) for i in best]
+
+    def _fuzzy_hits(self, question_norm: str, inverted: Optional[InvertedIndex],
+                    questions: List[str], recall_k: int, limit: int):
+        choices, ids = self._candidates(inverted, questions, question_norm, recall_k)
+        return [(choice, score, pos if ids is None else int(ids[pos]))
+                for choice, score, pos in process.extract(question_norm, choices,
+                                                          scorer=self.scorer, limit=limit)]
+
+    @staticmethod
+    def _candidates(inverted: Optional[InvertedIndex], questions: List[str],
+                    question_norm: str, recall_k: int) -> Tuple[List[str], Optional[Sequence[int]]]:
+        """Choices to score and their positions in ``questions`` (None when scanning all)."""
+        if inverted is not None and 0 < recall_k < len(questions):
+            ids = inverted.candidates(question_norm, recall_k)
+            if len(ids):
+                return [questions[i] for i in ids], ids
+        # Small category, pruning disabled, or no shared features: full scan
+        return questions, None
+
+# ------------------------------
+# Process-wide index
+# ------------------------------
+_index: Optional[FAQIndex] = None
+_index_kb: Optional[KnowledgeBase] = None
+_index_lock = threading.Lock()
+
+def load_index() -> FAQIndex:
+    """The index over the compiled knowledge base, rebuilt when the file is recompiled.
+
+    Configured from the environment: ``ANSWER_CACHE_SIZE``, ``ANSWER_CACHE_TTL``
+    and ``SEMANTIC_RANKING=1`` for hybrid ranking.
+    """
+    global _index, _index_kb
+    kb = knowledge_base.load()
+    if kb is _index_kb:
+        return _index
+    with _index_lock:
+        if kb is not _index_kb:
+            use_semantic = os.environ.get("SEMANTIC_RANKING", "").lower() in ("1", "true", "yes")
+            _index = FAQIndex(
+                kb,
+                cache_size=int(os.environ.get("ANSWER_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+                cache_ttl=float(os.environ.get("ANSWER_CACHE_TTL", DEFAULT_CACHE_TTL)),
+                semantic=semantic.load_or_build(kb) if use_semantic else None,
+            )
+            _index_kb = kb
+    return _index
+
+def find_best_answer(question: str, category: str) -> str:
+    return load_index().find_best_answer(question, category)
@@ -0,0 +1,254 @@
+"""Semantic ranking stage for paraphrases that fuzzy matching misses.
+
+FAQ vectors are computed once into an L2-normalized NumPy matrix and
+persisted next to the compiled knowledge base; a query then costs one
+encoding and one matrix-vector product. Two encoders are available:
+
+* ``LSAEncoder`` (default): TF-IDF over question and answer words folded into
+  a latent semantic space, with a small hand-tuned lexicon that maps everyday
+  wording ("boss", "let me go") onto the knowledge base's vocabulary (see the
+  note above ``PHRASES``). NumPy only, no network access.
+* ``SentenceTransformerEncoder``: a local sentence-transformers model, used
+  when the optional package is installed and ``SEMANTIC_MODEL`` names a model
+  directory.
+"""
+import math
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_DIM = 64
+
+# LSA is fitted on at most this many FAQs and this many terms; the remaining
+# FAQs are folded into the fitted space
+MAX_FIT_DOCS = 4000
+MAX_TERMS = 4000
+
+STOPWORDS = frozenset("""
+    a an the i me my we our you your he she it its they them their is are was were be been
+    am do does did can could should would shall may might must to of in on at for from
+    by with about into after before if or and but so than then that this these those what
+    which who whom how when where why there here any some all have has had get got just
+""".split())
+
+# Everyday wording -> knowledge base vocabulary. Phrases are rewritten first.
+# These were hand-tuned on the queries in benchmarks/paraphrases.jsonl ("let me
+# go", "no warning", "boss", ...), so results on that file are in-sample and
+# overstate the gain. Take new entries from wording seen outside the benchmark
+# files, and judge every change on benchmarks/paraphrases_holdout.jsonl, which
+# must never be used to pick entries.
+PHRASES = {
+    "let me go": "fire me", "let go": "fire", "laid off": "fire", "lay off": "fire",
+    "kicked out": "evict", "kick out": "evict", "kick me out": "evict me",
+    "money back": "refund", "take to court": "sue", "heads up": "notice",
+    "split up": "divorce", "break up": "divorce", "no warning": "without notice",
+}
+SYNONYMS = {
+    "boss": "employer", "manager": "employer", "supervisor": "employer", "company": "employer",
+    "workplace": "work", "job": "work", "worker": "employee", "staff": "employee",
+    "fired": "fire", "sacked": "fire", "dismissed": "fire", "terminated": "termination",
+    "warning": "notice", "paycheck": "salary", "wage": "wages", "quit": "resign",
+    "husband": "spouse", "wife": "spouse", "ex": "spouse", "kid": "child", "kids": "child",
+    "children": "child", "renter": "tenant", "evicted": "evict", "apartment": "property",
+    "house": "property", "home": "property", "flat": "property", "land": "property",
+    "broken": "defective", "faulty": "defective", "item": "product", "goods": "product",
+    "bought": "purchase", "buy": "purchase", "deal": "contract", "broke": "breach",
+    "slander": "defamation", "libel": "defamation", "lied": "false", "injured": "injury",
+    "hurt": "injury", "lawyer": "legal", "attorney": "legal", "married": "marriage",
+    "marry": "marriage", "inherit": "inherited",
+}
+_PHRASE_RE = re.compile(r"\b(" + "|".join(sorted(map(re.escape, PHRASES), key=len, reverse=True)) + r")\b")
+
+def tokenize(text: str) -> List[str]:
+    """Content words of ``text`` after lexicon mapping and plural stripping."""
+    text = re.sub(r"\W+", " ", text).strip().lower()
+    text = _PHRASE_RE.sub(lambda m: PHRASES[m.group(1)], text)
+    tokens = []
+    for word in text.split():
+        word = SYNONYMS.get(word, word)
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+# ------------------------------
+# Encoders
+# ------------------------------
+class LSAEncoder:
+    kind = "lsa"
+
+    def __init__(self, vocab: Dict[str, int], idf: np.ndarray, components: np.ndarray):
+        self.vocab = vocab
+        self.idf = idf
+        self.components = components  # terms x dim
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], dim: int = DEFAULT_DIM, seed: int = 0) -> "LSAEncoder":
+        rng = np.random.default_rng(seed)
+        if len(texts) > MAX_FIT_DOCS:
+            texts = [texts[i] for i in rng.choice(len(texts), MAX_FIT_DOCS, replace=False)]
+        docs = [tokenize(t) for t in texts]
+
+        df: Dict[str, int] = {}
+        for tokens in docs:
+            for term in set(tokens):
+                df[term] = df.get(term, 0) + 1
+        terms = sorted(df, key=lambda t: (-df[t], t))[:MAX_TERMS]
+        vocab = {term: i for i, term in enumerate(terms)}
+        idf = np.array([np.log((1 + len(docs)) / (1 + df[t])) + 1 for t in terms], dtype=np.float32)
+
+        tfidf = cls(vocab, idf, np.empty((len(vocab), 0), dtype=np.float32))._tfidf(docs)
+        dim = max(1, min(dim, min(tfidf.shape) - 1))
+        components = _truncated_svd(tfidf, dim, rng)
+        return cls(vocab, idf, components.astype(np.float32))
+
+    def _tfidf(self, docs: List[List[str]]) -> np.ndarray:
+        matrix = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, tokens in enumerate(docs):
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                col = self.vocab.get(token)
+                if col is not None:
+                    counts[col] = counts.get(col, 0) + 1
+            for col, count in counts.items():
+                matrix[row, col] = (1 + math.log(count)) * self.idf[col]
+        return _normalize_rows(matrix)
+
+    def encode(self, texts: Sequence[str], batch_size: int = 1024) -> np.ndarray:
+        out = np.empty((len(texts), self.components.shape[1]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            docs = [tokenize(t) for t in texts[start:start + batch_size]]
+            out[start:start + len(docs)] = self._tfidf(docs) @ self.components
+        return _normalize_rows(out)
+
+    def encode_one(self, text: str) -> np.ndarray:
+        """Same as ``encode([text])[0]``, gathering only the query's component rows."""
+        counts: Dict[int, int] = {}
+        for token in tokenize(text):
+            col = self.vocab.get(token)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return np.zeros(self.components.shape[1], dtype=np.float32)
+        cols = np.fromiter(counts, dtype=np.intp, count=len(counts))
+        weights = np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))) + 1
+        vector = (weights * self.idf[cols]) @ self.components[cols]
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def state(self) -> dict:
+        return {"terms": np.array(list(self.vocab)), "idf": self.idf, "components": self.components}
+
+    @classmethod
+    def from_state(cls, state) -> "LSAEncoder":
+        vocab = {str(term): i for i, term in enumerate(state["terms"])}
+        return cls(vocab, state["idf"], state["components"])
+
+def _truncated_svd(matrix: np.ndarray, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Top ``dim`` right singular vectors (terms x dim) of ``matrix``."""
+    if min(matrix.shape) <= 1000:
+        _, _, vt = np.linalg.svd(matrix, full_matrices=False)
+        return vt[:dim].T
+    # Randomized range finder with two power iterations (Halko et al.)
+    q = matrix.T @ rng.standard_normal((matrix.shape[0], dim + 10)).astype(np.float32)
+    for _ in range(2):
+        q, _ = np.linalg.qr(matrix.T @ (matrix @ q))
+    q, _ = np.linalg.qr(q)
+    _, _, vt = np.linalg.svd(matrix @ q, full_matrices=False)
+    return q @ vt[:dim].T
+
+class SentenceTransformerEncoder:
+    kind = "sentence-transformers"
+
+    def __init__(self, model: str):
+        from sentence_transformers import SentenceTransformer  # optional dependency
+
+        self.model_name = model
+        self._model = SentenceTransformer(model, local_files_only=True)
+
+    def encode(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        vectors = self._model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+        return _normalize_rows(vectors.astype(np.float32))
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+    def state(self) -> dict:
+        return {"model": np.array(self.model_name)}
+
+def default_encoder(texts: Sequence[str]):
+    """A local sentence-transformers model if configured and installed, else LSA fitted on ``texts``."""
+    model = os.environ.get("SEMANTIC_MODEL")
+    if model:
+        try:
+            return SentenceTransformerEncoder(model)
+        except ImportError:
+            pass
+    return LSAEncoder.fit(texts)
+
+# ------------------------------
+# FAQ vector matrix
+# ------------------------------
+class SemanticIndex:
+    """One L2-normalized vector per FAQ, in knowledge base order."""
+
+    def __init__(self, encoder, matrix: np.ndarray, fingerprint: str = ""):
+        self.encoder = encoder
+        self.matrix = matrix
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, questions: Sequence[str], answers: Sequence[str], encoder=None,
+              fingerprint: str = "") -> "SemanticIndex":
+        # Answers contribute context words ("termination", "custody") the
+        # short questions lack
+        texts = [f"{q} {q} {a}" for q, a in zip(questions, answers)]
+        encoder = encoder or default_encoder(texts)
+        return cls(encoder, encoder.encode(texts), fingerprint)
+
+    def query(self, question: str) -> np.ndarray:
+        return self.encoder.encode_one(question)
+
+    def save(self, path: str) -> None:
+        # A unique temp file per writer: forked server workers may rebuild at once
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, kind=np.array(self.encoder.kind), matrix=self.matrix,
+                         fingerprint=np.array(self.fingerprint), **self.encoder.state())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "SemanticIndex":
+        with np.load(path) as state:
+            if str(state["kind"]) == SentenceTransformerEncoder.kind:
+                encoder = SentenceTransformerEncoder(str(state["model"]))
+            else:
+                encoder = LSAEncoder.from_state(state)
+            return cls(encoder, state["matrix"], str(state["fingerprint"]))
+
+def load_or_build(kb, path: Optional[str] = None) -> SemanticIndex:
+    """Load the persisted vectors for compiled knowledge base ``kb``, rebuilding them when stale."""
+    path = path or os.path.splitext(kb.path)[0] + ".vectors.npz"
+    fingerprint = f"{kb.mtime_ns}:{kb.faq_count}"
+    if os.path.exists(path):
+        try:
+            index = SemanticIndex.load(path)
+            if index.fingerprint == fingerprint:
+                return index
+        except Exception:
+            pass  # missing, torn or from another version: rebuild it
+    index = SemanticIndex.build(kb.all_questions, kb.answers, fingerprint=fingerprint)
+    index.save(path)
+    return index
@@ -0,0 +1,264 @@
+"""Headless HTTP answer service.
+
+A small asyncio HTTP/1.1 server (standard library only) in front of the
+matching core, for running the matcher behind a load balancer without the
+Streamlit runtime. Scoring runs on a thread pool so the event loop keeps
+accepting connections.
+
+Endpoints::
+
+    GET  /health                                          -> {"status": "ok", ...}
+    GET  /metrics                                         -> Prometheus text (stage latencies)
+    POST /answer  {"question": ..., "category": ...}      -> one /batch result
+    POST /batch   {"queries": [{"question", "category"}]} -> {"results": [...]}
+
+Stage timings for /metrics are recorded with ``MATCHER_INSTRUMENTATION=1``;
+each process reports its own.
+
+``/batch`` scores each chunk of rows in one ``cdist`` call per category, the
+way ``python -m batch`` does. That path scans every question with fuzz.ratio.
+It does not use the answer cache, inverted-index pruning or
+``SEMANTIC_RANKING``. So for the same question ``/answer`` can return a
+different FAQ, most often when hybrid ranking is on.
+
+Keep-alive connections are closed after ``--idle-timeout`` seconds without a
+request. Bodies must carry a Content-Length; ``Transfer-Encoding`` (chunked
+uploads) is rejected with 501 and the connection is closed.
+
+``--processes N`` builds the index once and then forks N workers that share
+the listening socket and, copy-on-write, the prebuilt index::
+
+    python -m server --port 8000 --processes 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from http import HTTPStatus
+from typing import Optional, Tuple
+
+import instrumentation
+from batch import DEFAULT_CHUNK_SIZE, _chunks, score_chunk
+from matcher import ALL_CATEGORIES, load_index
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 10 * 2**20
+MAX_BATCH = 10_000
+IDLE_TIMEOUT = 15.0
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+# ------------------------------
+# Handlers
+# ------------------------------
+def _json_body(body: bytes) -> dict:
+    try:
+        data = json.loads(body or b"null")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "body is not valid JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+    return data
+
+def _query(item) -> Tuple[str, str]:
+    if not isinstance(item, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "each query must be a JSON object")
+    question, category = item.get("question"), item.get("category", ALL_CATEGORIES)
+    if not isinstance(question, str) or not question.strip() or not isinstance(category, str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "question and category must be non-empty strings")
+    return question, category
+
+def handle_answer(body: bytes) -> dict:
+    """Same fields as a /batch result; ``matched_question`` is None without a match."""
+    question, category = _query(_json_body(body))
+    index = load_index()
+    match = index.match(question, category)
+    if match is None:
+        # Cached by match() above; tells "no data" from "no match"
+        return {"question": question, "category": category,
+                "answer": index.find_best_answer(question, category),
+                "matched_question": None, "score": 0.0}
+    return {"question": question, "category": match.category, "answer": match.answer,
+            "matched_question": match.question, "score": round(match.score, 2)}
+
+def handle_batch(body: bytes) -> dict:
+    queries = _json_body(body).get("queries")
+    if not isinstance(queries, list):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "queries must be a list")
+    if len(queries) > MAX_BATCH:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_BATCH} queries per batch")
+    rows = [_query(item) for item in queries]
+    index = load_index()
+    # Chunks bound the cdist matrix to DEFAULT_CHUNK_SIZE rows x category size
+    return {"results": [asdict(result) for chunk in _chunks(rows, DEFAULT_CHUNK_SIZE)
+                        for result in score_chunk(index, chunk)]}
+
+def handle_health(body: bytes) -> dict:
+    return {"status": "ok", "faqs": len(load_index()), "pid": os.getpid()}
+
+def handle_metrics(body: bytes) -> str:
+    return instrumentation.prometheus_text()
+
+ROUTES = {
+    ("GET", "/health"): handle_health,
+    ("GET", "/metrics"): handle_metrics,
+    ("POST", "/answer"): handle_answer,
+    ("POST", "/batch"): handle_batch,
+}
+
+# ------------------------------
+# HTTP/1.1 connection handling
+# ------------------------------
+async def _read_request(reader: asyncio.StreamReader,
+                        idle_timeout: float = IDLE_TIMEOUT) -> Optional[Tuple[str, str, dict, bytes]]:
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), idle_timeout)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+        return None  # client closed the connection or stayed idle
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    if "transfer-encoding" in headers:
+        # The body's framing is unknown, so the connection cannot be reused
+        raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length < 0 or length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    try:
+        body = await asyncio.wait_for(reader.readexactly(length), idle_timeout) if length else b""
+    except asyncio.TimeoutError:
+        raise HTTPError(HTTPStatus.REQUEST_TIMEOUT)
+    headers[":version"] = version
+    return method, target.split("?", 1)[0], headers, body
+
+def _response(status: HTTPStatus, payload, keep_alive: bool) -> bytes:
+    """JSON for dicts; strings (the metrics export) are sent as plain text."""
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+class AnswerServer:
+    def __init__(self, threads: int = 4, idle_timeout: float = IDLE_TIMEOUT):
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="answer")
+        self.idle_timeout = idle_timeout
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader, self.idle_timeout)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (
+                        headers[":version"] == "HTTP/1.1" or connection == "keep-alive")
+                    handler = ROUTES.get((method, path))
+                    if handler is None:
+                        allowed = any(route_path == path for _, route_path in ROUTES)
+                        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED if allowed else HTTPStatus.NOT_FOUND)
+                    # CPU-bound scoring stays off the event loop
+                    with instrumentation.stage("request"):
+                        payload = await loop.run_in_executor(self.executor, handler, body)
+                    status = HTTPStatus.OK
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception:  # keep serving other requests
+                    logger.exception("unhandled error in %s %s", method, path)
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, sock: socket.socket):
+        server = await asyncio.start_server(self.handle_connection, sock=sock)
+        async with server:
+            await server.serve_forever()
+
+# ------------------------------
+# Process management
+# ------------------------------
+def _listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+def run(host: str = "127.0.0.1", port: int = 8000, processes: int = 1, threads: int = 4,
+        idle_timeout: float = IDLE_TIMEOUT) -> None:
+    load_index()  # build before forking so every worker shares it
+    sock = _listen(host, port)
+    print(f"Serving on http://{host}:{sock.getsockname()[1]} with {processes} process(es)",
+          file=sys.stderr)
+
+    children = []
+    for _ in range(processes - 1):
+        pid = os.fork()
+        if pid == 0:
+            children = []
+            break
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    asyncio.run(AnswerServer(threads, idle_timeout).serve(sock))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Headless legal FAQ answer service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--processes", type=int, default=1, help="worker processes sharing the socket")
+    parser.add_argument("--threads", type=int, default=4, help="scoring threads per process")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="seconds before an idle keep-alive connection is closed")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s")
+    run(args.host, args.port, args.processes, args.threads, args.idle_timeout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())